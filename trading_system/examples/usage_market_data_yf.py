@@ -2,8 +2,6 @@ import sys
 import os
 import asyncio
 import logging
-from datetime import datetime
-import pandas as pd
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +9,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.market_data.types import MarketRequest, Timeframe
 from src.market_data.yfinance_provider import YFinanceProvider
 
+def print_bar(values):
+    for column in ['Open', 'High', 'Low', 'Close']:
+        print(f"{column}: ${values[column]:.2f}")
+    print(f"Volume: {values['Volume']:,.0f}")
+
 async def main():
     logging.basicConfig(
         level=logging.INFO,
@@ -28,18 +31,8 @@ async def main():
         latest = latest_data_dict.get(symbol)
         if latest is not None:
             print(f"\nFound data for {symbol}:")
-            for column in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                value = latest[column]
-
-                # If value is a Series, extract the scalar value
-                if isinstance(value, pd.Series):
-                    value = value.iloc[0]
-
-                if column == 'Volume':
-                    print(f"{column}: {value:,}")
-                else:
-                    print(f"{column}: ${value:.2f}")
-            print(f"Time: {latest.name}")
+            print_bar(latest)
+            print(f"Time: {latest['Time']}")
         else:
             print(f"\nNo data found for {symbol}")
 
@@ -49,23 +42,14 @@ async def main():
     historical_data_dict = await provider.get_historical_data(requests)
 
     for symbol in symbols:
-        latest = latest_data_dict.get(symbol)
-        if latest is not None:
-            print(f"\nFound data for {symbol}:")
-            for column in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                value = latest[column]
-
-                # If value is a Series, extract the scalar value
-                if isinstance(value, pd.Series):
-                    value = value.iloc[0]
-
-                if column == 'Volume':
-                    print(f"{column}: {value:,}")
-                else:
-                    print(f"{column}: ${value:.2f}")
-            print(f"Time: {latest.name}")
+        data = historical_data_dict.get(symbol)
+        if data is not None:
+            print(f"\nHistorical data for {symbol}:")
+            print(f"Total data points: {len(data)}")
+            print_bar(data.iloc[-1].to_dict())
+            print(f"Time: {data.index[-1]}")
         else:
-            print(f"\nNo data found for {symbol}")
+            print(f"\nNo historical data found for {symbol}")
 
 
     print("\n=== Fetching Updated Historical Data for Multiple Symbols ===")
@@ -80,5 +64,7 @@ async def main():
         else:
             print(f"\nNo updated historical data found for {symbol}")
 
+    await provider.close()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
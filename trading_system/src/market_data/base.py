@@ -1,14 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, List
 from .types import DataType, MarketRequest
 
 class MarketProvider(ABC):
     @abstractmethod
-    async def get_historical_data(self, request: MarketRequest) -> Optional[DataType]:
+    async def get_historical_data(self, requests: List[MarketRequest]) -> Dict[str, DataType]:
         """Get historical market data"""
         pass
 
     @abstractmethod
-    async def get_latest_data(self, symbol: str) -> Optional[DataType]:
+    async def get_latest_data(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """Get latest market data"""
-        pass
\ No newline at end of file
+        pass
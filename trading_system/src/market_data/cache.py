@@ -1,38 +1,381 @@
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Generic, TypeVar
+from datetime import timedelta
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Generic, Tuple, TypeVar
+import asyncio
+import heapq
+import json
 import logging
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from .types import SymbolSeries
 
 T = TypeVar('T')
 
+DEFAULT_CACHE_DIR = Path("~/.cache/market_data").expanduser()
+
 class MarketCache(Generic[T]):
-    def __init__(self, expiry_minutes: int = 5):
-        self._cache: Dict[str, T] = {}
-        self._timestamps: Dict[str, datetime] = {}
-        self.expiry = timedelta(minutes=expiry_minutes)
+    """
+    In-memory cache with adaptive per-timeframe TTLs, an LRU memory budget
+    and an optional parquet copy of each entry in cache_dir.
+    """
+
+    # Number of sets between bulk sweeps of expired entries
+    SWEEP_INTERVAL = 64
+    # Weight of the newest interval in the change-interval EWMA
+    CHANGE_EWMA_ALPHA = 0.3
+
+    def __init__(
+        self,
+        expiry: Optional[Dict[str, timedelta]] = None,
+        default_expiry: timedelta = timedelta(minutes=5),
+        cache_dir: Optional[Path] = None,
+        adaptive_bounds: Tuple[float, float] = (0.5, 4.0),
+        memory_base: int = 64 * 1024 * 1024,
+        memory_per_entry: int = 1024 * 1024
+    ):
+        # key -> (value, monotonic-ns expiry deadline, size in bytes), in LRU order;
+        # one tuple per key, so a value is never seen without its deadline
+        self._entries: OrderedDict[str, Tuple[T, int, int]] = OrderedDict()
+        self._bytes_used = 0
+        self.memory_base = memory_base
+        self.memory_per_entry = memory_per_entry
+        # id(ts) -> number of cached SymbolSeries sharing that timestamp array
+        self._ts_refs: Dict[int, int] = {}
+        # key -> monotonic ns until which it counts as live, plus a heap of those deadlines
+        self._live: Dict[str, int] = {}
+        self._live_heap: List[Tuple[int, str]] = []
+        self._heap: List[Tuple[int, str]] = []
+        self._sets_since_sweep = 0
+        self._ttl_ns = {timeframe: self._to_ns(ttl) for timeframe, ttl in (expiry or {}).items()}
+        self._default_ttl_ns = self._to_ns(default_expiry)
+        self.adaptive_bounds = adaptive_bounds
+        self._fingerprints: Dict[str, Any] = {}
+        self._last_change_ns: Dict[str, int] = {}
+        self._change_interval_ns: Dict[str, float] = {}
+        self._path = Path(cache_dir) if cache_dir is not None else None
+        # key -> (value, TTL, wall-clock time of the set) waiting to be written to disk
+        self._pending: Dict[str, Tuple[T, int, int]] = {}
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    @staticmethod
+    def _to_ns(ttl: timedelta) -> int:
+        return int(ttl.total_seconds() * 1_000_000_000)
+
     def get(self, key: str) -> Optional[T]:
-        if key not in self._cache:
-            return None
-        
-        cached_time = self._timestamps.get(key)
-        if cached_time and datetime.now() - cached_time > self.expiry:
+        """Return the value of key if it hasn't expired, loading it from disk on a memory miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._load(key)
+
+        value, expiry_ns, _ = entry
+        if expiry_ns >= time.monotonic_ns():
+            self._entries.move_to_end(key)
+            return value
+
+        if self.logger.isEnabledFor(logging.INFO):
             self.logger.info(f"Cache expired for {key}")
-            self._cache.pop(key)
-            self._timestamps.pop(key)
-            return None
-            
-        return self._cache.get(key)
+        self._evict(key)
+        self._forget(key)
+        return None
+
+    async def get_async(self, key: str) -> Optional[T]:
+        """Like get(), but reads disk entries in a worker thread."""
+        if self._path is None or key in self._entries or key in self._pending:
+            return self.get(key)
+        loaded = await asyncio.to_thread(self._read, key)
+        if key in self._entries:
+            # Set while the file was being read, so the disk copy is older
+            return self.get(key)
+        return self._admit(key, loaded)
+
+    def ttl_for(self, key: str, timeframe: Optional[str] = None) -> int:
+        """
+        Return the TTL in nanoseconds for key, adapted to its observed change rate.
+
+        It is half the EWMA of the intervals between changes (or of the time
+        since the last change, if longer), clamped to adaptive_bounds times
+        the timeframe TTL.
+        """
+        ttl_ns = self._ttl_ns.get(timeframe, self._default_ttl_ns)
+        last_change_ns = self._last_change_ns.get(key)
+        if last_change_ns is None:
+            return ttl_ns
+
+        # Until an interval has been observed, assume the one that maps to the base TTL
+        interval_ns = max(
+            self._change_interval_ns.get(key, 2.0 * ttl_ns),
+            time.monotonic_ns() - last_change_ns
+        )
+        low, high = self.adaptive_bounds
+        return int(min(ttl_ns * high, max(ttl_ns * low, interval_ns * 0.5)))
+
+    def set(self, key: str, value: T, timeframe: Optional[str] = None) -> None:
+        """Cache value for ttl_for(key, timeframe); the disk copy is only queued, see flush()."""
+        self._track_change(key, value)
+        ttl_ns = self.ttl_for(key, timeframe)
+        self._put(key, value, time.monotonic_ns() + ttl_ns)
+        if self._path is not None and isinstance(value, (SymbolSeries, pd.DataFrame)):
+            self._pending[key] = (value, ttl_ns, time.time_ns())
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Cached data for {key}")
+
+        self._sets_since_sweep += 1
+        if self._sets_since_sweep >= self.SWEEP_INTERVAL:
+            self._sweep()
+
+    def flush(self, keys: Optional[List[str]] = None) -> None:
+        """Write queued entries (all of them, or only those in keys) to disk."""
+        self._write(self._take_pending(keys))
+
+    async def flush_async(self, keys: Optional[List[str]] = None) -> None:
+        """Like flush(), but does the writing in a worker thread."""
+        pending = self._take_pending(keys)
+        if pending:
+            await asyncio.to_thread(self._write, pending)
+
+    def _take_pending(self, keys: Optional[List[str]]) -> Dict[str, Tuple[T, int, int]]:
+        """Dequeue entries on the calling thread, so writers never see the queue change under them."""
+        if keys is None:
+            pending, self._pending = self._pending, {}
+            return pending
+        return {key: self._pending.pop(key) for key in keys if key in self._pending}
+
+    def _write(self, pending: Dict[str, Tuple[T, int, int]]) -> None:
+        for key, (value, ttl_ns, timestamp_ns) in pending.items():
+            self._store(key, value, ttl_ns, timestamp_ns)
+
+    def touch(self, key: str, timeframe: Optional[str] = None) -> None:
+        """Count key as live for one timeframe TTL; the memory budget grows with the live keys."""
+        deadline = time.monotonic_ns() + self._ttl_ns.get(timeframe, self._default_ttl_ns)
+        self._live[key] = deadline
+        heapq.heappush(self._live_heap, (deadline, key))
+
+    @property
+    def live_entries(self) -> int:
+        now = time.monotonic_ns()
+        while self._live_heap and self._live_heap[0][0] < now:
+            deadline, key = heapq.heappop(self._live_heap)
+            # Keys touched again since carry a newer deadline
+            if self._live.get(key) == deadline:
+                del self._live[key]
+        return len(self._live)
+
+    def budget(self, n: int) -> int:
+        """Return the memory budget in bytes for n live entries."""
+        return self.memory_base + self.memory_per_entry * n
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes_used
 
-    def set(self, key: str, value: T) -> None:
-        self._cache[key] = value
-        self._timestamps[key] = datetime.now()
-        self.logger.info(f"Cached data for {key}")
+    def _put(self, key: str, value: T, expiry_ns: int) -> None:
+        """Insert an entry as most recently used, then evict LRU entries while over budget(live_entries)."""
+        self._evict(key)
+        size = self._nbytes(value)
+        self._entries[key] = (value, expiry_ns, size)
+        self._bytes_used += size + self._ref_ts(value, 1)
+        heapq.heappush(self._heap, (expiry_ns, key))
+
+        while len(self._entries) > 1 and self._bytes_used > self.budget(self.live_entries):
+            evicted_key, entry = self._entries.popitem(last=False)
+            self._release(entry)
+            self._forget(evicted_key)
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Evicted {evicted_key} to stay within the memory budget")
+
+    def _ref_ts(self, value: Any, delta: int) -> int:
+        """Add delta references to the ts array of a SymbolSeries; return its size if it was the first or last one."""
+        if not isinstance(value, SymbolSeries):
+            return 0
+        ts_id = id(value.ts)
+        refs = self._ts_refs.get(ts_id, 0) + delta
+        if refs:
+            self._ts_refs[ts_id] = refs
+        else:
+            del self._ts_refs[ts_id]
+        return value.ts.nbytes if refs == (1 if delta > 0 else 0) else 0
+
+    def _release(self, entry: Tuple[T, int, int]) -> None:
+        value, _, size = entry
+        self._bytes_used -= size + self._ref_ts(value, -1)
+
+    @staticmethod
+    def _nbytes(value: Any) -> int:
+        """Size of value in bytes; the ts array of a SymbolSeries is counted once per array by _ref_ts()."""
+        if isinstance(value, SymbolSeries):
+            return value.nbytes - value.ts.nbytes
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(index=True, deep=False))
+        return sys.getsizeof(value)
+
+    @staticmethod
+    def _fingerprint(value: Any) -> Any:
+        """Cheap change check: length and newest timestamp."""
+        if isinstance(value, SymbolSeries):
+            return len(value), value.last_ns
+        if isinstance(value, (pd.DataFrame, pd.Series)) and len(value):
+            return len(value), value.index[-1]
+        return None
+
+    def _track_change(self, key: str, value: T) -> None:
+        """Update the change-interval EWMA of key if value differs from the stored one."""
+        fingerprint = self._fingerprint(value)
+        if fingerprint is None or fingerprint == self._fingerprints.get(key):
+            return
+
+        now = time.monotonic_ns()
+        last_change_ns = self._last_change_ns.get(key)
+        if last_change_ns is not None:
+            interval_ns = now - last_change_ns
+            previous = self._change_interval_ns.get(key)
+            if previous is None:
+                self._change_interval_ns[key] = float(interval_ns)
+            else:
+                alpha = self.CHANGE_EWMA_ALPHA
+                self._change_interval_ns[key] = alpha * interval_ns + (1 - alpha) * previous
+        self._fingerprints[key] = fingerprint
+        self._last_change_ns[key] = now
+
+    def _sweep(self) -> None:
+        """Evict every entry whose deadline has passed, swapping in the surviving entries at once."""
+        self._sets_since_sweep = 0
+        now = time.monotonic_ns()
+        expired = set()
+        while self._heap and self._heap[0][0] < now:
+            expiry_ns, key = heapq.heappop(self._heap)
+            # Keys that were set again since carry a newer deadline
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expiry_ns:
+                expired.add(key)
+        if expired:
+            for key in expired:
+                self._release(self._entries[key])
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in self._entries.items() if key not in expired
+            )
+            for key in expired:
+                self._forget(key)
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._release(entry)
+
+    def _forget(self, key: str) -> None:
+        """Drop the change history of key."""
+        self._fingerprints.pop(key, None)
+        self._last_change_ns.pop(key, None)
+        self._change_interval_ns.pop(key, None)
 
     def clear(self, key: Optional[str] = None) -> None:
         if key:
-            self._cache.pop(key, None)
-            self._timestamps.pop(key, None)
+            self._evict(key)
+            self._pending.pop(key, None)
+            self._live.pop(key, None)
+            self._remove(key)
+            self._forget(key)
         else:
-            self._cache.clear()
-            self._timestamps.clear()
\ No newline at end of file
+            if self._path is not None and self._path.exists():
+                for path in self._path.glob('*.parquet'):
+                    self._remove(path.stem)
+            self._entries = OrderedDict()
+            self._bytes_used = 0
+            self._ts_refs.clear()
+            self._pending = {}
+            self._live.clear()
+            self._live_heap.clear()
+            self._heap.clear()
+            self._fingerprints.clear()
+            self._last_change_ns.clear()
+            self._change_interval_ns.clear()
+
+    def _files(self, key: str):
+        name = key.replace(os.sep, '_')
+        return self._path / f"{name}.parquet", self._path / f"{name}.meta"
+
+    def _load(self, key: str) -> Optional[T]:
+        """Load a still-fresh entry from the write queue or disk into memory."""
+        if self._path is None:
+            return None
+        pending = self._pending.get(key)
+        if pending is not None:
+            value, ttl_ns, timestamp_ns = pending
+            remaining_ns = timestamp_ns + ttl_ns - time.time_ns()
+            if remaining_ns <= 0:
+                return None
+            self._put(key, value, time.monotonic_ns() + remaining_ns)
+            return value
+        return self._admit(key, self._read(key))
+
+    def _read(self, key: str) -> Optional[Tuple[T, int]]:
+        """Read a still-fresh entry and its remaining TTL from disk; safe to run off the loop thread."""
+        data_file, meta_file = self._files(key)
+        try:
+            if not meta_file.exists():
+                return None
+            meta = json.loads(meta_file.read_text())
+            # Wall-clock time is used on disk since monotonic time doesn't survive restarts
+            remaining_ns = meta['timestamp'] + meta['ttl'] - time.time_ns()
+            if remaining_ns <= 0:
+                return None
+            value = pd.read_parquet(data_file, memory_map=True)
+            if meta.get('kind') == 'series':
+                value = SymbolSeries.from_frame(value)
+            return value, remaining_ns
+        except Exception as e:
+            self.logger.warning(f"Failed to load {key} from disk cache: {str(e)}")
+            return None
+
+    def _admit(self, key: str, loaded: Optional[Tuple[T, int]]) -> Optional[T]:
+        if loaded is None:
+            return None
+        value, remaining_ns = loaded
+        self._put(key, value, time.monotonic_ns() + remaining_ns)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Loaded {key} from disk cache")
+        return value
+
+    def _store(self, key: str, value: T, ttl_ns: int, timestamp_ns: int) -> None:
+        """Persist a DataFrame or SymbolSeries entry; the sidecar is written last so readers never see partial data."""
+        if self._path is None:
+            return
+        if isinstance(value, SymbolSeries):
+            kind, frame = 'series', value.to_frame()
+        elif isinstance(value, pd.DataFrame):
+            kind, frame = 'frame', value
+        else:
+            return
+        data_file, meta_file = self._files(key)
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._replace(data_file, frame.to_parquet)
+            meta = json.dumps({'timestamp': timestamp_ns, 'ttl': ttl_ns, 'kind': kind})
+            self._replace(meta_file, lambda path: Path(path).write_text(meta))
+        except Exception as e:
+            self.logger.warning(f"Failed to write {key} to disk cache: {str(e)}")
+
+    def _replace(self, target: Path, write) -> None:
+        """Write target through a temp file of its own, so concurrent flushes of a key never share one."""
+        fd, tmp_name = tempfile.mkstemp(dir=self._path, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_name)
+            os.replace(tmp_name, target)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def _remove(self, key: str) -> None:
+        if self._path is None:
+            return
+        for path in self._files(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
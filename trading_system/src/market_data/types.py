@@ -1,7 +1,8 @@
 # src/market_data/market_types.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Union
+from typing import ClassVar, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
 DataType = Union[pd.DataFrame, pd.Series]
@@ -16,3 +17,95 @@ class Timeframe(Enum):
 class MarketRequest:
     symbol: str
     timeframe: Timeframe
+
+@dataclass
+class SymbolSeries:
+    """
+    OHLCV bars of a single symbol stored as one NumPy array per column.
+
+    ts holds naive UTC timestamps as int64 nanoseconds and is sorted
+    ascending, so windowing and merging can use searchsorted. The newest
+    timestamp is also kept as a plain int in last_ns for cheap access.
+    Arrays may be shared between series and are never modified in place.
+    """
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    last_ns: int = field(init=False, repr=False, compare=False)
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __post_init__(self) -> None:
+        self.last_ns = int(self.ts[-1]) if len(self.ts) else 0
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays())
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return (self.ts, self.open, self.high, self.low, self.close, self.volume)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> 'SymbolSeries':
+        """Build from a DataFrame with OHLCV columns and a naive DatetimeIndex."""
+        return cls(
+            ts=np.asarray(data.index, dtype='datetime64[ns]').view('int64'),
+            open=data['Open'].to_numpy(dtype='float64'),
+            high=data['High'].to_numpy(dtype='float64'),
+            low=data['Low'].to_numpy(dtype='float64'),
+            close=data['Close'].to_numpy(dtype='float64'),
+            volume=data['Volume'].fillna(0).to_numpy(dtype='int64'),
+        )
+
+    def datetime_index(self) -> pd.DatetimeIndex:
+        """Return the timestamps as a DatetimeIndex."""
+        return pd.DatetimeIndex(self.ts.view('datetime64[ns]'), name='Datetime')
+
+    def to_frame(self, index: Optional[pd.DatetimeIndex] = None) -> pd.DataFrame:
+        """
+        Materialize the bars as a DataFrame indexed by timestamp.
+
+        index may be passed to reuse a DatetimeIndex already built for
+        identical timestamps, e.g. from another symbol of the same batch.
+        """
+        if index is None:
+            index = self.datetime_index()
+        return pd.DataFrame(dict(zip(self.COLUMNS, self._arrays()[1:])), index=index)
+
+    def merge(self, other: 'SymbolSeries', cutoff_ns: int) -> 'SymbolSeries':
+        """
+        Append newer bars and drop those before cutoff_ns in a single pass.
+
+        Cached bars within the time span of other are replaced by it, while
+        those before or after it are kept, so merging a partial refetch never
+        loses newer cached bars. The slice bounds are found once on the
+        timestamp arrays, then every column is copied into one preallocated
+        buffer.
+        """
+        start = np.searchsorted(self.ts, cutoff_ns, side='left')
+        other_start = np.searchsorted(other.ts, cutoff_ns, side='left')
+        if other_start < len(other):
+            stop = max(start, np.searchsorted(self.ts, other.ts[other_start], side='left'))
+            resume = max(stop, np.searchsorted(self.ts, other.ts[-1], side='right'))
+        else:
+            stop = resume = len(self)
+        if start == 0 and stop == len(self) and other_start == len(other):
+            return self
+
+        kept = stop - start
+        added = kept + len(other) - other_start
+        size = added + len(self) - resume
+        arrays = []
+        for mine, theirs in zip(self._arrays(), other._arrays()):
+            merged = np.empty(size, dtype=mine.dtype)
+            merged[:kept] = mine[start:stop]
+            merged[kept:added] = theirs[other_start:]
+            merged[added:] = mine[resume:]
+            arrays.append(merged)
+        return SymbolSeries(*arrays)
@@ -1,208 +1,563 @@
 import asyncio
+import dataclasses
 import logging
-import yfinance as yf
+import random
+import sys
+import time
+import aiohttp
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional, List, Dict, Tuple
 from .base import MarketProvider
-from .types import DataType, MarketRequest, Timeframe
+from .types import MarketRequest, SymbolSeries, Timeframe
 from .cache import MarketCache  # Ensure this import is correct
 
 class YFinanceProvider(MarketProvider):
-    def __init__(self, cache_expiry_minutes: int = 5):
+    CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+    # Yahoo hands out session cookies on COOKIE_URL and a matching crumb token on CRUMB_URL
+    COOKIE_URL = "https://fc.yahoo.com"
+    CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+    # Yahoo starts answering 429 when too many requests hit it at once
+    MAX_CONCURRENT_REQUESTS = 6
+    MAX_RETRIES = 5
+
+    # Yahoo throttles requests that don't look like they come from a browser
+    HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+    # Cache key suffixes, interned so building a key is a single concatenation
+    _KEY_SUFFIX = {timeframe: sys.intern(f"_{timeframe.value}") for timeframe in Timeframe}
+
+    # Length of the rolling history window kept per symbol
+    WINDOW_NS = 5 * 24 * 60 * 60 * 1_000_000_000
+
+    # Base cache TTLs follow how often bars of each timeframe change;
+    # MarketCache adapts them per symbol to the observed update rate
+    CACHE_EXPIRY = {
+        Timeframe.MINUTE: timedelta(seconds=60),
+        Timeframe.FIVE_MINUTES: timedelta(minutes=5),
+        Timeframe.HOURLY: timedelta(hours=1),
+        Timeframe.DAILY: timedelta(hours=24),
+    }
+
+    def __init__(
+        self,
+        cache_expiry: Optional[Dict[Timeframe, timedelta]] = None,
+        cache_dir: Optional[Path] = None
+    ):
         """
         Initialize the YFinanceProvider with a cache and logger.
+
+        Args:
+            cache_expiry (Optional[Dict[Timeframe, timedelta]]): Per-timeframe cache TTLs,
+                defaults to CACHE_EXPIRY.
+            cache_dir (Optional[Path]): Directory of the on-disk cache, e.g. DEFAULT_CACHE_DIR;
+                the cache is kept in memory only by default.
         """
-        self.cache = MarketCache[DataType](expiry_minutes=cache_expiry_minutes)
+        expiry = {timeframe.value: ttl for timeframe, ttl in (cache_expiry or self.CACHE_EXPIRY).items()}
+        self.cache = MarketCache[SymbolSeries](expiry=expiry, cache_dir=cache_dir)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        # None until fetched; '' when Yahoo didn't hand one out
+        self._crumb: Optional[str] = None
+        self._crumb_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        # Fetches in progress by cache key and by symbol, see _claim()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_latest: Dict[str, asyncio.Future] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it on first use since it is bound to the running loop.
+        """
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(limit_per_host=6, ttl_dns_cache=300)
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers=self.HEADERS,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                )
+                self._crumb = None
+            return self._session
+
+    async def _get_crumb(self, session: aiohttp.ClientSession) -> str:
+        """
+        Return the crumb of the shared session, doing the cookie handshake on first use.
+
+        A rate-limited handshake backs off like any other request, and one
+        that fails is tried again by the next request.
+        """
+        async with self._crumb_lock:
+            if self._crumb is not None:
+                return self._crumb
+            try:
+                for attempt in range(self.MAX_RETRIES + 1):
+                    async with self._semaphore:
+                        # The cookie response itself is an error page; only its cookies matter
+                        async with session.get(self.COOKIE_URL) as response:
+                            await response.read()
+                        async with session.get(self.CRUMB_URL) as response:
+                            if response.status != 429 or attempt == self.MAX_RETRIES:
+                                response.raise_for_status()
+                                self._crumb = (await response.text()).strip()
+                                return self._crumb
+                    await self._backoff(attempt, self.CRUMB_URL)
+            except Exception as e:
+                self.logger.warning(f"Could not obtain Yahoo crumb, continuing without it: {str(e)}")
+            # Left unset, so the next request tries the handshake again
+            return ''
+
+    async def close(self) -> None:
+        """
+        Flush queued disk cache writes and close the shared HTTP session.
+        """
+        await self.cache.flush_async()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def _claim(registry: Dict[str, asyncio.Future], key: str) -> asyncio.Future:
+        """
+        Register a fetch in progress for key; concurrent callers await its result instead of refetching.
+        """
+        future = asyncio.get_running_loop().create_future()
+        registry[key] = future
+        return future
+
+    @staticmethod
+    def _resolve(registry: Dict[str, asyncio.Future], key: str, result: Any) -> None:
+        """
+        Hand the result of a fetch to its waiters and unregister it.
+        """
+        future = registry.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _release(registry: Dict[str, asyncio.Future], claims: Dict[str, asyncio.Future]) -> None:
+        """
+        Unblock waiters of claims whose fetch never ran, e.g. because the caller was cancelled.
+        """
+        for key, future in claims.items():
+            if not future.done():
+                future.set_result(None)
+            if registry.get(key) is future:
+                del registry[key]
+
+    @staticmethod
+    async def _wait_inflight(symbol: str, future: asyncio.Future) -> Dict[str, Any]:
+        """
+        Wait for another caller's fetch; shielded so a cancelled waiter doesn't cancel the fetch.
+        """
+        result = await asyncio.shield(future)
+        return {symbol: result} if result is not None else {}
 
     async def get_historical_data(self, requests: List[MarketRequest]) -> Dict[str, pd.DataFrame]:
         """
         Get historical market data with the latest updates for multiple symbols.
 
+        Cached symbols are updated individually, while cache misses are grouped
+        by timeframe and fetched concurrently, one chart request per symbol.
+        Symbols already being fetched by another caller are not requested again.
+
         Args:
             requests (List[MarketRequest]): List of market requests for each symbol.
 
         Returns:
             Dict[str, pd.DataFrame]: A dictionary mapping symbols to their data.
         """
-        tasks = [self._get_symbol_historical_data(request) for request in requests]
-        results = await asyncio.gather(*tasks)
-        return {request.symbol: data for request, data in zip(requests, results) if data is not None}
+        claims: Dict[str, asyncio.Future] = {}
+        claimed: List[MarketRequest] = []
+        waiting: List[Tuple[str, asyncio.Future]] = []
+        misses: Dict[Timeframe, List[str]] = {}
+        for request in requests:
+            cache_key = request.symbol + self._KEY_SUFFIX[request.timeframe]
+            # Keys requested within their TTL count towards the cache's memory budget
+            self.cache.touch(cache_key, request.timeframe.value)
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                waiting.append((request.symbol, inflight))
+                continue
+
+            # Claimed before the cache lookup below yields, so no other caller fetches the key too
+            claims[cache_key] = self._claim(self._inflight, cache_key)
+            claimed.append(request)
+
+        try:
+            cached = await asyncio.gather(*(self.cache.get_async(key) for key in claims))
+            tasks = [self._wait_inflight(symbol, future) for symbol, future in waiting]
+            for request, cached_data in zip(claimed, cached):
+                if cached_data is not None:
+                    tasks.append(self._get_symbol_historical_data(request, cached_data))
+                else:
+                    misses.setdefault(request.timeframe, []).append(request.symbol)
+
+            for timeframe, symbols in misses.items():
+                tasks.append(self._get_batch_historical_data(symbols, timeframe))
+
+            results = await asyncio.gather(*tasks)
+        finally:
+            self._release(self._inflight, claims)
+        # Persist this cycle's updates so the write queue never outgrows one cycle
+        await self.cache.flush_async()
+        data = {}
+        for result in results:
+            data.update(result)
+        # Symbols with the same timestamps share one DatetimeIndex
+        indexes: Dict[int, pd.DatetimeIndex] = {}
+        frames = {}
+        for symbol, series in self._share_timestamps(data).items():
+            index = indexes.get(id(series.ts))
+            if index is None:
+                index = indexes[id(series.ts)] = series.datetime_index()
+            frames[symbol] = series.to_frame(index)
+        return frames
+
+    @staticmethod
+    def _share_timestamps(data: Dict[str, SymbolSeries]) -> Dict[str, SymbolSeries]:
+        """
+        Point series with identical timestamps at a single read-only ts array.
 
-    async def _get_symbol_historical_data(self, request: MarketRequest) -> Optional[pd.DataFrame]:
+        Symbols of one batch usually trade in the same minutes, so this keeps
+        one timestamp array per batch instead of one per symbol.
         """
-        Get historical market data with the latest updates for a single symbol.
+        shared: Dict[Tuple[int, int, int], np.ndarray] = {}
+        result = {}
+        for symbol, series in data.items():
+            if len(series):
+                key = (len(series), int(series.ts[0]), series.last_ns)
+                ts = shared.get(key)
+                if ts is None:
+                    shared[key] = series.ts
+                elif ts is not series.ts and np.array_equal(ts, series.ts):
+                    ts.flags.writeable = False
+                    series = dataclasses.replace(series, ts=ts)
+            result[symbol] = series
+        return result
+
+    async def _get_symbol_historical_data(self, request: MarketRequest, cached_data: SymbolSeries) -> Dict[str, SymbolSeries]:
+        """
+        Update cached historical market data with the latest bars for a single symbol.
+
+        The cache holds columnar SymbolSeries, so appending new bars and
+        trimming the window only touch the arrays, and the DataFrame is
+        built once on the way out.
         """
         symbol = request.symbol
         timeframe = request.timeframe
+        cache_key = symbol + self._KEY_SUFFIX[timeframe]
+        updated_data = None
         try:
-            cache_key = f"{symbol}_{timeframe.value}"
-            cached_data = self.cache.get(cache_key)
-
-            if cached_data is not None:
+            if self.logger.isEnabledFor(logging.INFO):
                 self.logger.info(f"Cache hit for {symbol}")
-                self.logger.info(f"Cached data range: {cached_data.index[0]} to {cached_data.index[-1]}")
-
-                # Fetch new data from the last cached time
-                last_cached_time = cached_data.index[-1]
-                latest_data = await self._fetch_data_since(symbol, last_cached_time, timeframe)
-
-                if latest_data is not None and not latest_data.empty:
-                    # Combine with cached data
-                    updated_data = pd.concat([cached_data, latest_data])
-                    # Remove duplicates
-                    updated_data = updated_data[~updated_data.index.duplicated(keep='last')]
-                    # Maintain a rolling 5-day window
-                    cutoff = datetime.utcnow() - timedelta(days=5)
-                    updated_data = updated_data[updated_data.index >= cutoff]
-                    self.cache.set(cache_key, updated_data)
-                    return updated_data
-
+                self.logger.info(f"Cached data range: {pd.Timestamp(cached_data.ts[0])} to {pd.Timestamp(cached_data.last_ns)}")
+
+            # Refetch from the newest cached bar, which may still have been
+            # forming, so merge() replaces it with its final values
+            start_time = cached_data.last_ns // 1_000_000_000
+            end_time = int(time.time())
+            if start_time >= end_time:
+                updated_data = cached_data
+                return {symbol: updated_data}
+            data = await self._fetch_chart(
+                [symbol],
+                timeframe.value,
+                period1=start_time,
+                period2=end_time
+            )
+            latest_data = data.get(symbol)
+
+            if latest_data is not None:
+                # Append to cached data, replacing any overlapping bars, and
+                # maintain a rolling 5-day window; only the kept bars are copied
+                cutoff = time.time_ns() - self.WINDOW_NS
+                updated_data = cached_data.merge(latest_data, cutoff)
+                self.cache.set(cache_key, updated_data, timeframe.value)
+            else:
                 # No new data; return cached data
-                return cached_data
+                updated_data = cached_data
+            return {symbol: updated_data}
 
-            # Cache miss; fetch historical data
-            self.logger.info(f"Cache miss for {symbol}, fetching 5-day history")
-            data = await self._fetch_historical(symbol, timeframe)
-            if data is not None:
-                self.cache.set(cache_key, data)
-                return data
+        except Exception as e:
+            self.logger.error(f"Error getting historical data for {symbol}: {str(e)}")
+            return {}
 
-            self.logger.warning(f"No data available for {symbol}")
-            return None
+        finally:
+            self._resolve(self._inflight, cache_key, updated_data)
+
+    async def _get_batch_historical_data(self, symbols: List[str], timeframe: Timeframe) -> Dict[str, SymbolSeries]:
+        """
+        Fetch and cache 5-day history for the symbols of one timeframe missing from the cache.
+
+        The chart endpoint serves one symbol per request, so this only groups
+        the per-symbol requests; _get_json bounds how many run at once.
+        """
+        data: Dict[str, SymbolSeries] = {}
+        try:
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Cache miss for {', '.join(symbols)}, fetching 5-day history")
+            data = await self._fetch_chart(symbols, timeframe.value, range_='5d')
+            for symbol in symbols:
+                if symbol in data:
+                    self.cache.set(symbol + self._KEY_SUFFIX[timeframe], data[symbol], timeframe.value)
+                else:
+                    self.logger.warning(f"No data available for {symbol}")
+            return data
 
         except Exception as e:
-            self.logger.error(f"Error getting historical data for {symbol}: {str(e)}")
-            return None
+            self.logger.error(f"Error getting historical data for {', '.join(symbols)}: {str(e)}")
+            data = {}
+            return data
 
-    async def get_latest_data(self, symbols: List[str]) -> Dict[str, Optional[pd.Series]]:
+        finally:
+            for symbol in symbols:
+                self._resolve(self._inflight, symbol + self._KEY_SUFFIX[timeframe], data.get(symbol))
+
+    async def get_latest_data(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """
         Get the latest market data points for multiple symbols.
 
+        Quotes are the newest 1-minute bar of the day's chart, read straight
+        from its JSON and returned as plain dicts without building any
+        DataFrame.
+
         Args:
             symbols (List[str]): List of stock ticker symbols.
 
         Returns:
-            Dict[str, Optional[pd.Series]]: A dictionary mapping symbols to their latest data point.
-        """
-        tasks = [self._get_symbol_latest_data(symbol) for symbol in symbols]
-        results = await asyncio.gather(*tasks)
-        return {symbol: data for symbol, data in zip(symbols, results) if data is not None}
-
-    async def _get_symbol_latest_data(self, symbol: str) -> Optional[pd.Series]:
-        """
-        Get the latest market data point for a single symbol.
+            Dict[str, Dict[str, Any]]: A dictionary mapping symbols to their latest
+            'Open', 'High', 'Low', 'Close', 'Volume' and 'Time' values.
         """
-        try:
-            self.logger.info(f"Fetching latest data for symbol: {symbol}")
-            data = await self._fetch_latest(symbol)
-            if data is not None and not data.empty:
-                latest = data.iloc[-1]
-                return latest
+        tasks = []
+        claims: Dict[str, asyncio.Future] = {}
+        for symbol in dict.fromkeys(symbols):
+            inflight = self._inflight_latest.get(symbol)
+            if inflight is not None:
+                tasks.append(self._wait_inflight(symbol, inflight))
             else:
-                self.logger.warning(f"No latest data available for {symbol}")
-                return None
-        except Exception as e:
-            self.logger.error(f"Error fetching latest data for {symbol}: {str(e)}")
-            return None
+                claims[symbol] = self._claim(self._inflight_latest, symbol)
+
+        if claims:
+            tasks.append(self._get_batch_latest_data(list(claims)))
 
-    async def _fetch_historical(self, symbol: str, timeframe: Timeframe) -> Optional[pd.DataFrame]:
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            self._release(self._inflight_latest, claims)
+        data = {}
+        for result in results:
+            data.update(result)
+        # Waiters share the fetched dicts, so every caller gets its own copies
+        return {symbol: dict(data[symbol]) for symbol in dict.fromkeys(symbols) if symbol in data}
+
+    async def _get_batch_latest_data(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        Fetch 5 days of data for a single symbol.
+        Get the latest quote for a group of symbols, one chart request each.
         """
+        data: Dict[str, Dict[str, Any]] = {}
         try:
-            interval = timeframe.value
-            data = await asyncio.to_thread(
-                yf.download,
-                tickers=symbol,
-                period='5d',
-                interval=interval,
-                progress=False
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Fetching latest data for symbols: {', '.join(symbols)}")
+            data = await self._fetch_latest(symbols)
+            for symbol in symbols:
+                if symbol not in data:
+                    self.logger.warning(f"No latest data available for {symbol}")
+            return data
 
-            if data.empty:
-                self.logger.warning(f"No historical data returned for {symbol}")
-                return None
+        except Exception as e:
+            self.logger.error(f"Error getting latest data for {', '.join(symbols)}: {str(e)}")
+            data = {}
+            return data
 
-            # Drop the symbol level if present
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.droplevel(0)
+        finally:
+            for symbol in symbols:
+                self._resolve(self._inflight_latest, symbol, data.get(symbol))
 
-            data.index = data.index.tz_localize(None)
-            return data
+    async def _fetch_latest(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch the latest 1-minute bar of several symbols from the chart endpoint.
 
-        except Exception as e:
-            self.logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
-            return None
+        Args:
+            symbols (List[str]): Stock ticker symbols.
 
-    async def _fetch_latest(self, symbol: str) -> Optional[pd.DataFrame]:
+        Returns:
+            Dict[str, Dict[str, Any]]: Latest quote per symbol; symbols without data are omitted.
+        """
+        params = {'range': '1d', 'interval': '1m', 'includeAdjustedClose': 'false'}
+        session = await self._get_session()
+        tasks = [self._fetch_chart_result(session, symbol, params) for symbol in symbols]
+        results = await asyncio.gather(*tasks)
+        quotes = {}
+        for symbol, result in zip(symbols, results):
+            quote = self._parse_latest(result) if result is not None else None
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+
+    @staticmethod
+    def _parse_latest(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Pick the newest bar with a close price straight out of a chart result's JSON lists.
+        """
+        timestamps = result.get('timestamp') or []
+        quote = ((result.get('indicators') or {}).get('quote') or [{}])[0]
+        closes = quote.get('close') or []
+        for i in range(min(len(timestamps), len(closes)) - 1, -1, -1):
+            if closes[i] is None:
+                continue
+            values = {}
+            for column, field in (('Open', 'open'), ('High', 'high'), ('Low', 'low'), ('Close', 'close')):
+                series = quote.get(field) or []
+                value = series[i] if i < len(series) else None
+                values[column] = float(value) if value is not None else float('nan')
+            volumes = quote.get('volume') or []
+            volume = volumes[i] if i < len(volumes) else None
+            values['Volume'] = int(volume) if volume is not None else 0
+            values['Time'] = datetime.fromtimestamp(timestamps[i], timezone.utc).replace(tzinfo=None)
+            return values
+        return None
+
+    async def _fetch_chart(
+        self,
+        symbols: List[str],
+        interval: str,
+        range_: Optional[str] = None,
+        period1: Optional[int] = None,
+        period2: Optional[int] = None
+    ) -> Dict[str, SymbolSeries]:
         """
-        Fetch the latest data for today for a single symbol.
+        Fetch bars for several symbols from the Yahoo chart endpoint.
+
+        Requests for the individual symbols share one pooled session and run
+        concurrently. Either range_ or period1/period2 should be given.
 
         Args:
-            symbol (str): Stock ticker symbol.
+            symbols (List[str]): Stock ticker symbols.
+            interval (str): Bar interval, e.g. '1m'.
+            range_ (Optional[str]): Range ending now, e.g. '5d'.
+            period1 (Optional[int]): Start time as UTC epoch seconds.
+            period2 (Optional[int]): End time as UTC epoch seconds.
 
         Returns:
-            Optional[pd.DataFrame]: DataFrame with the latest data.
+            Dict[str, SymbolSeries]: Per-symbol bars with naive UTC timestamps;
+            symbols without data are omitted.
         """
-        try:
-            data = await asyncio.to_thread(
-                yf.download,
-                tickers=symbol,
-                period='1d',
-                interval='1m',
-                progress=False
-            )
+        # Only OHLCV is used downstream, so don't have Yahoo send adjusted closes
+        params = {'interval': interval, 'includeAdjustedClose': 'false'}
+        if range_ is not None:
+            params['range'] = range_
+        else:
+            params['period1'] = str(period1)
+            params['period2'] = str(period2)
+
+        session = await self._get_session()
+        tasks = [self._fetch_symbol_chart(session, symbol, params) for symbol in symbols]
+        results = await asyncio.gather(*tasks)
+        return self._share_timestamps({symbol: data for symbol, data in zip(symbols, results) if data is not None})
 
-            if data.empty:
-                self.logger.warning(f"No latest data returned for {symbol}")
-                return None
+    async def _get_json(self, session: aiohttp.ClientSession, url: str, params: Dict[str, str]) -> Any:
+        """
+        GET url and decode its JSON body.
 
-            data.index = data.index.tz_localize(None)
-            return data
+        At most MAX_CONCURRENT_REQUESTS requests are in flight at once, and
+        HTTP 429 responses are retried with exponential backoff and jitter
+        up to MAX_RETRIES times. The session crumb is attached to every
+        request and fetched again if Yahoo rejects it with HTTP 401.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            crumb = await self._get_crumb(session)
+            request_params = {**params, 'crumb': crumb} if crumb else params
+            async with self._semaphore:
+                async with session.get(url, params=request_params) as response:
+                    if response.status == 401 and attempt < self.MAX_RETRIES:
+                        if self._crumb == crumb:
+                            self._crumb = None
+                        continue
+                    if response.status != 429 or attempt == self.MAX_RETRIES:
+                        response.raise_for_status()
+                        return await response.json()
+
+            await self._backoff(attempt, url)
+
+    async def _backoff(self, attempt: int, url: str) -> None:
+        """
+        Wait before retrying a rate-limited request, with exponential backoff and jitter.
+        """
+        delay = 2 ** attempt + random.random()
+        self.logger.warning(f"Rate limited by Yahoo, retrying {url} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def _fetch_chart_result(
+        self,
+        session: aiohttp.ClientSession,
+        symbol: str,
+        params: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the decoded chart result of a single symbol.
+        """
+        try:
+            payload = await self._get_json(session, self.CHART_URL.format(symbol=symbol), params)
+            chart = payload.get('chart') or {}
+            if chart.get('error') or not chart.get('result'):
+                self.logger.warning(f"No chart data returned for {symbol}: {chart.get('error')}")
+                return None
+            return chart['result'][0]
 
         except Exception as e:
-            self.logger.error(f"Error fetching latest data for {symbol}: {str(e)}")
+            self.logger.error(f"Error fetching chart data for {symbol}: {str(e)}")
             return None
 
-    async def _fetch_data_since(self, symbol: str, last_time: pd.Timestamp, timeframe: Timeframe) -> Optional[pd.DataFrame]:
+    async def _fetch_symbol_chart(
+        self,
+        session: aiohttp.ClientSession,
+        symbol: str,
+        params: Dict[str, str]
+    ) -> Optional[SymbolSeries]:
+        """
+        Fetch and parse the chart of a single symbol.
         """
-        Fetch data from the last cached time to now for a single symbol.
+        result = await self._fetch_chart_result(session, symbol, params)
+        if result is None:
+            return None
 
-        Args:
-            symbol (str): Stock ticker symbol.
-            last_time (pd.Timestamp): Last cached timestamp.
-            timeframe (Timeframe): Timeframe for the data.
+        data = self._parse_chart(result)
+        if data is None and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"No bars available for {symbol} with {params}")
+        return data
 
-        Returns:
-            Optional[pd.DataFrame]: DataFrame with the new data.
+    @staticmethod
+    def _parse_chart(result: Dict[str, Any]) -> Optional[SymbolSeries]:
         """
-        try:
-            # Add a small delta to avoid overlapping data
-            start_time = last_time + timedelta(minutes=1)
-            end_time = datetime.utcnow()
-
-            # Convert times to strings in the format required by yfinance
-            start_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
-            end_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
-
-            data = await asyncio.to_thread(
-                yf.download,
-                tickers=symbol,
-                interval=timeframe.value,
-                start=start_str,
-                end=end_str,
-                progress=False
-            )
-
-            if data.empty:
-                self.logger.info(f"No new data available for {symbol} since {start_str}")
-                return None
+        Build a SymbolSeries from a chart result's timestamp and quote arrays.
 
-            data.index = data.index.tz_localize(None)
-            return data
+        The JSON lists are converted straight into NumPy arrays, so no
+        DataFrame is built on the fetch path.
+        """
+        timestamps = result.get('timestamp')
+        if not timestamps:
+            return None
 
-        except Exception as e:
-            self.logger.error(f"Error fetching data since {last_time} for {symbol}: {str(e)}")
+        indicators = result.get('indicators') or {}
+        quote = (indicators.get('quote') or [{}])[0]
+        ts = np.asarray(timestamps, dtype='int64') * 1_000_000_000
+        # Missing values arrive as nulls, which become NaN in float arrays
+        prices = [
+            np.asarray(quote[field], dtype='float64') if quote.get(field) else np.full(len(ts), np.nan)
+            for field in ('open', 'high', 'low', 'close')
+        ]
+        volume = np.asarray(quote.get('volume') or np.zeros(len(ts)), dtype='float64')
+
+        # Yahoo reports bars without trades as nulls
+        valid = ~np.isnan(np.vstack(prices)).all(axis=0)
+        if not valid.any():
             return None
+        if not valid.all():
+            ts, volume = ts[valid], volume[valid]
+            prices = [price[valid] for price in prices]
+
+        return SymbolSeries(ts, *prices, volume=np.nan_to_num(volume).astype('int64'))
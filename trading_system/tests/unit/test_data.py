@@ -1,11 +1,597 @@
 """
 test_data
 ---------
-Description of this module.
+Unit tests for the market data types and cache.
 """
 
-from typing import Dict, List, Optional
-import logging
+import asyncio
+import time
+from datetime import timedelta
+from types import SimpleNamespace
 
-logger = logging.getLogger(__name__)
+import numpy as np
+import pandas as pd
+import pytest
 
+from src.market_data import cache as cache_module
+from src.market_data.cache import MarketCache
+from src.market_data.types import MarketRequest, SymbolSeries, Timeframe
+from src.market_data.yfinance_provider import YFinanceProvider
+
+SECOND_NS = 1_000_000_000
+
+
+def make_series(ts, close=None) -> SymbolSeries:
+    """Build a series with the given timestamps; prices default to the timestamps."""
+    ts = np.asarray(ts, dtype='int64')
+    close = ts.astype('float64') if close is None else np.asarray(close, dtype='float64')
+    return SymbolSeries(ts, close, close, close, close, ts.copy())
+
+
+def test_merge_overlap_keeps_cached_bars_after_other():
+    cached = make_series([1, 2, 3, 4, 5])
+    merged = cached.merge(make_series([2], close=[20.0]), cutoff_ns=0)
+
+    assert merged.ts.tolist() == [1, 2, 3, 4, 5]
+    assert merged.close.tolist() == [1.0, 20.0, 3.0, 4.0, 5.0]
+    assert merged.last_ns == 5
+
+
+def test_merge_pure_append():
+    cached = make_series([1, 2, 3])
+    merged = cached.merge(make_series([4, 5]), cutoff_ns=2)
+
+    assert merged.ts.tolist() == [2, 3, 4, 5]
+    assert merged.volume.tolist() == [2, 3, 4, 5]
+    assert merged.volume.dtype == np.int64
+
+
+def test_merge_cutoff_past_cached_head():
+    cached = make_series([1, 2, 3])
+    merged = cached.merge(make_series([5, 6]), cutoff_ns=4)
+
+    assert merged.ts.tolist() == [5, 6]
+
+
+def test_merge_without_changes_returns_self():
+    cached = make_series([1, 2, 3])
+
+    assert cached.merge(make_series([]), cutoff_ns=0) is cached
+
+
+def test_frame_round_trip():
+    ts = pd.date_range('2024-01-02 14:30', periods=3, freq='min').as_unit('ns').asi8
+    series = make_series(ts, close=[1.5, 2.5, 3.5])
+    frame = series.to_frame()
+
+    assert list(frame.columns) == list(SymbolSeries.COLUMNS)
+    assert frame.index[0] == pd.Timestamp('2024-01-02 14:30')
+    assert frame['Volume'].dtype == np.int64
+
+    restored = SymbolSeries.from_frame(frame)
+    for mine, theirs in zip(series._arrays(), restored._arrays()):
+        np.testing.assert_array_equal(mine, theirs)
+    assert restored.last_ns == series.last_ns
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the clocks seen by MarketCache with one advanced by hand."""
+    clock = SimpleNamespace(now_ns=1_700_000_000 * SECOND_NS)
+    fake_time = SimpleNamespace(
+        monotonic_ns=lambda: clock.now_ns,
+        time_ns=lambda: clock.now_ns,
+    )
+    monkeypatch.setattr(cache_module, 'time', fake_time)
+    return clock
+
+
+def test_cache_entry_expires_after_ttl(clock):
+    cache = MarketCache(expiry={'1m': timedelta(seconds=60)})
+    series = make_series([1, 2])
+    cache.set('A_1m', series, '1m')
+
+    clock.now_ns += 59 * SECOND_NS
+    assert cache.get('A_1m') is series
+
+    clock.now_ns += 2 * SECOND_NS
+    assert cache.get('A_1m') is None
+    assert cache.bytes_used == 0
+
+
+def test_cache_sweep_evicts_expired_entries(clock):
+    cache = MarketCache(default_expiry=timedelta(seconds=10))
+    cache.SWEEP_INTERVAL = 3
+    cache.set('A_1m', make_series([1]))
+    cache.set('B_1m', make_series([1]))
+
+    clock.now_ns += 11 * SECOND_NS
+    cache.set('C_1m', make_series([1]))
+
+    assert list(cache._entries) == ['C_1m']
+    assert cache.bytes_used == make_series([1]).nbytes
+    assert list(cache._fingerprints) == ['C_1m']
+
+
+def test_cache_reloads_flushed_entries_from_disk(clock, tmp_path):
+    cache = MarketCache(default_expiry=timedelta(seconds=60), cache_dir=tmp_path)
+    series = make_series([1, 2, 3], close=[1.0, 2.0, 3.0])
+    cache.set('A_1m', series)
+    assert not list(tmp_path.iterdir())
+
+    asyncio.run(cache.flush_async())
+    clock.now_ns += 30 * SECOND_NS
+    reloaded = MarketCache(cache_dir=tmp_path).get('A_1m')
+
+    assert isinstance(reloaded, SymbolSeries)
+    np.testing.assert_array_equal(reloaded.ts, series.ts)
+    np.testing.assert_array_equal(reloaded.close, series.close)
+
+    clock.now_ns += 31 * SECOND_NS
+    assert MarketCache(cache_dir=tmp_path).get('A_1m') is None
+
+
+def test_cache_evicts_least_recently_used_over_budget(clock):
+    size = make_series([1, 2]).nbytes
+    cache = MarketCache(memory_base=0, memory_per_entry=size)
+    cache.touch('A_1m')
+    cache.touch('B_1m')
+    cache.set('A_1m', make_series([1, 2]))
+    cache.set('B_1m', make_series([1, 2]))
+    cache.get('A_1m')
+    cache.set('C_1m', make_series([1, 2]))
+
+    assert list(cache._entries) == ['A_1m', 'C_1m']
+    assert cache.bytes_used == 2 * size
+    assert 'B_1m' not in cache._fingerprints
+    assert cache.get('B_1m') is None
+
+
+def test_cache_counts_keys_touched_within_their_ttl_as_live(clock):
+    cache = MarketCache(expiry={'1m': timedelta(seconds=60)})
+    cache.touch('A_1m', '1m')
+    cache.touch('B_1m', '1m')
+
+    clock.now_ns += 30 * SECOND_NS
+    cache.touch('C_1m', '1m')
+    assert cache.live_entries == 3
+
+    clock.now_ns += 31 * SECOND_NS
+    assert cache.live_entries == 1
+
+
+def test_cache_counts_shared_timestamps_once(clock):
+    ts = np.arange(4, dtype='int64')
+    first = make_series(ts)
+    second = SymbolSeries(ts, first.close.copy(), first.close, first.close, first.close, first.volume)
+    cache = MarketCache()
+    cache.set('A_1m', first)
+    cache.set('B_1m', second)
+
+    assert cache.bytes_used == first.nbytes + second.nbytes - ts.nbytes
+
+    cache.clear('A_1m')
+    assert cache.bytes_used == second.nbytes
+    cache.clear('B_1m')
+    assert cache.bytes_used == 0
+
+
+def test_cache_serves_unflushed_entries_after_lru_eviction(clock, tmp_path):
+    size = make_series([1, 2]).nbytes
+    cache = MarketCache(cache_dir=tmp_path, memory_base=0, memory_per_entry=size)
+    cache.touch('A_1m')
+    series = make_series([1, 2])
+    cache.set('A_1m', series)
+    cache.set('B_1m', make_series([1, 2]))
+
+    assert 'A_1m' not in cache._entries
+    assert cache.get('A_1m') is series
+
+
+def chart_payload(timestamps, close):
+    """Build a chart endpoint response with one bar per timestamp."""
+    quote = {'open': close, 'high': close, 'low': close, 'close': close, 'volume': [100] * len(close)}
+    return {'chart': {'result': [{'timestamp': list(timestamps), 'indicators': {'quote': [quote]}}]}}
+
+
+@pytest.fixture
+def provider():
+    """A provider whose HTTP layer answers from provider.respond and records every call."""
+    provider = YFinanceProvider()
+    provider.calls = []
+
+    async def get_session():
+        return None
+
+    async def get_json(session, url, params):
+        provider.calls.append((url, params))
+        await asyncio.sleep(0)
+        return provider.respond(url, params)
+
+    provider._get_session = get_session
+    provider._get_json = get_json
+    return provider
+
+
+def test_refetch_replaces_the_newest_cached_bar(provider):
+    last = int(time.time()) // 60 * 60 - 60
+    cached = make_series(np.array([last - 60, last]) * SECOND_NS, close=[1.0, 1.5])
+    provider.cache.set('A_1m', cached, '1m')
+    provider.respond = lambda url, params: chart_payload([last, last + 60], [2.0, 3.0])
+
+    data = asyncio.run(provider.get_historical_data([MarketRequest('A', Timeframe.MINUTE)]))
+
+    assert provider.calls[0][1]['period1'] == str(last)
+    assert data['A']['Close'].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_refetch_is_skipped_within_the_newest_bar(provider):
+    now = int(time.time())
+    cached = make_series(np.array([now - 60, now + 60]) * SECOND_NS)
+    provider.cache.set('A_1m', cached, '1m')
+
+    data = asyncio.run(provider.get_historical_data([MarketRequest('A', Timeframe.MINUTE)]))
+
+    assert provider.calls == []
+    assert len(data['A']) == 2
+
+
+def test_history_updates_are_flushed_every_cycle(provider, tmp_path):
+    provider.cache = MarketCache(cache_dir=tmp_path)
+    last = int(time.time()) // 60 * 60 - 60
+    provider.cache.set('A_1m', make_series(np.array([last]) * SECOND_NS), '1m')
+    provider.respond = lambda url, params: chart_payload([last, last + 60], [2.0, 3.0])
+
+    asyncio.run(provider.get_historical_data([MarketRequest('A', Timeframe.MINUTE)]))
+
+    assert provider.cache._pending == {}
+    assert len(MarketCache(cache_dir=tmp_path).get('A_1m')) == 2
+
+
+def test_provider_loads_disk_entries_off_the_loop(provider, tmp_path, monkeypatch):
+    last = int(time.time()) // 60 * 60
+    writer = MarketCache(cache_dir=tmp_path)
+    writer.set('A_1m', make_series(np.array([last - 60, last]) * SECOND_NS), '1m')
+    writer.flush()
+    provider.cache = MarketCache(cache_dir=tmp_path)
+    provider.respond = lambda url, params: chart_payload([last], [2.0])
+
+    threads = []
+    to_thread = asyncio.to_thread
+
+    async def record_thread(func, *args):
+        threads.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(cache_module.asyncio, 'to_thread', record_thread)
+    data = asyncio.run(provider.get_historical_data([MarketRequest('A', Timeframe.MINUTE)]))
+
+    assert threads[0] == '_read'
+    assert len(data['A']) == 2
+    assert [path.suffix for path in tmp_path.iterdir() if path.suffix == '.tmp'] == []
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def read(self):
+        return str(self.body).encode()
+
+    async def text(self):
+        return self.body
+
+    async def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class FakeSession:
+    """Answers each URL with its scripted (status, body) pairs in turn, repeating the last one."""
+
+    def __init__(self, routes):
+        self.routes = {url: list(responses) for url, responses in routes.items()}
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, params))
+        responses = self.routes[url]
+        status, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        return FakeResponse(status, body)
+
+
+@pytest.fixture
+def http_provider():
+    """A provider with real request handling whose backoff sleeps are recorded instead of slept."""
+    provider = YFinanceProvider()
+    provider.delays = []
+
+    async def backoff(attempt, url):
+        provider.delays.append(attempt)
+
+    provider._backoff = backoff
+    return provider
+
+
+def test_crumb_handshake_backs_off_on_429(http_provider):
+    session = FakeSession({
+        YFinanceProvider.COOKIE_URL: [(404, '')],
+        YFinanceProvider.CRUMB_URL: [(429, ''), (200, 'abc\n')],
+    })
+
+    assert asyncio.run(http_provider._get_crumb(session)) == 'abc'
+    assert http_provider.delays == [0]
+
+
+def test_failed_crumb_handshake_is_retried(http_provider):
+    session = FakeSession({
+        YFinanceProvider.COOKIE_URL: [(404, '')],
+        YFinanceProvider.CRUMB_URL: [(500, ''), (200, 'abc')],
+    })
+
+    assert asyncio.run(http_provider._get_crumb(session)) == ''
+    assert http_provider._crumb is None
+    assert asyncio.run(http_provider._get_crumb(session)) == 'abc'
+
+
+def test_401_without_a_crumb_redoes_the_handshake(http_provider):
+    url = YFinanceProvider.CHART_URL.format(symbol='A')
+    session = FakeSession({
+        YFinanceProvider.COOKIE_URL: [(404, '')],
+        YFinanceProvider.CRUMB_URL: [(200, ''), (200, 'abc')],
+        url: [(401, {}), (200, {'chart': {}})],
+    })
+
+    assert asyncio.run(http_provider._get_json(session, url, {})) == {'chart': {}}
+    assert session.calls[-1] == (url, {'crumb': 'abc'})
+
+
+async def wait_until(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_concurrent_history_calls_share_in_flight_fetches(provider):
+    now = int(time.time())
+    provider.respond = lambda url, params: chart_payload([now - 60], [1.0])
+    minute = Timeframe.MINUTE
+
+    async def main():
+        return await asyncio.gather(
+            provider.get_historical_data([MarketRequest('A', minute), MarketRequest('B', minute)]),
+            provider.get_historical_data([MarketRequest('A', minute), MarketRequest('A', minute)]),
+        )
+
+    first, second = asyncio.run(main())
+
+    assert len(provider.calls) == 2
+    assert sorted(first) == ['A', 'B']
+    assert list(second) == ['A']
+    assert provider._inflight == {}
+
+
+def test_concurrent_latest_calls_share_in_flight_fetches(provider):
+    now = int(time.time())
+    provider.respond = lambda url, params: chart_payload([now - 60], [1.0])
+
+    async def main():
+        return await asyncio.gather(provider.get_latest_data(['A', 'A']), provider.get_latest_data(['A']))
+
+    first, second = asyncio.run(main())
+
+    assert len(provider.calls) == 1
+    assert first == second
+    assert first['A'] is not second['A']
+    assert provider._inflight_latest == {}
+
+
+@pytest.fixture
+def gated_provider(provider):
+    """A provider whose HTTP calls block until provider.gate is set."""
+    now = int(time.time())
+
+    async def get_json(session, url, params):
+        provider.calls.append((url, params))
+        await provider.gate.wait()
+        return chart_payload([now - 60], [1.0])
+
+    provider._get_json = get_json
+    return provider
+
+
+def test_cancelled_owner_releases_its_waiters(gated_provider):
+    request = MarketRequest('A', Timeframe.MINUTE)
+
+    async def main():
+        gated_provider.gate = asyncio.Event()
+        owner = asyncio.create_task(gated_provider.get_historical_data([request]))
+        await wait_until(lambda: gated_provider.calls)
+        waiter = asyncio.create_task(gated_provider.get_historical_data([request]))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(main()) == {}
+    assert gated_provider._inflight == {}
+
+
+def test_owner_cancelled_before_fetching_releases_its_waiters(provider):
+    request = MarketRequest('A', Timeframe.MINUTE)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def get_async(key):
+            await gate.wait()
+
+        provider.cache.get_async = get_async
+        owner = asyncio.create_task(provider.get_historical_data([request]))
+        await wait_until(lambda: provider._inflight)
+        waiter = asyncio.create_task(provider.get_historical_data([request]))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(main()) == {}
+    assert provider.calls == []
+    assert provider._inflight == {}
+
+
+def test_cancelled_waiter_does_not_cancel_the_fetch(gated_provider):
+    request = MarketRequest('A', Timeframe.MINUTE)
+
+    async def main():
+        gated_provider.gate = asyncio.Event()
+        owner = asyncio.create_task(gated_provider.get_historical_data([request]))
+        await wait_until(lambda: gated_provider.calls)
+        waiter = asyncio.create_task(gated_provider.get_historical_data([request]))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        gated_provider.gate.set()
+        return await owner
+
+    assert list(asyncio.run(main())) == ['A']
+    assert len(gated_provider.calls) == 1
+
+
+def crumb_routes(url, responses, crumbs=((200, 'abc'),)):
+    return {
+        YFinanceProvider.COOKIE_URL: [(404, '')],
+        YFinanceProvider.CRUMB_URL: list(crumbs),
+        url: responses,
+    }
+
+
+def test_get_json_backs_off_on_429(http_provider):
+    url = YFinanceProvider.CHART_URL.format(symbol='A')
+    session = FakeSession(crumb_routes(url, [(429, {}), (429, {}), (200, {'chart': {}})]))
+
+    assert asyncio.run(http_provider._get_json(session, url, {})) == {'chart': {}}
+    assert http_provider.delays == [0, 1]
+
+
+def test_get_json_gives_up_after_max_retries(http_provider):
+    url = YFinanceProvider.CHART_URL.format(symbol='A')
+    session = FakeSession(crumb_routes(url, [(429, {})]))
+
+    with pytest.raises(RuntimeError, match='429'):
+        asyncio.run(http_provider._get_json(session, url, {}))
+    assert http_provider.delays == list(range(YFinanceProvider.MAX_RETRIES))
+
+
+def test_get_json_refreshes_a_rejected_crumb(http_provider):
+    url = YFinanceProvider.CHART_URL.format(symbol='A')
+    session = FakeSession(crumb_routes(url, [(401, {}), (200, {'chart': {}})], crumbs=[(200, 'old'), (200, 'new')]))
+
+    assert asyncio.run(http_provider._get_json(session, url, {'interval': '1m'})) == {'chart': {}}
+    chart_calls = [params for called, params in session.calls if called == url]
+    assert chart_calls == [{'interval': '1m', 'crumb': 'old'}, {'interval': '1m', 'crumb': 'new'}]
+    assert http_provider.delays == []
+
+
+def test_ttl_for_adapts_within_bounds(clock):
+    cache = MarketCache(expiry={'1m': timedelta(seconds=60)}, adaptive_bounds=(0.5, 4.0))
+    assert cache.ttl_for('A_1m', '1m') == 60 * SECOND_NS
+
+    cache.set('A_1m', make_series([1]), '1m')
+    assert cache.ttl_for('A_1m', '1m') == 60 * SECOND_NS
+
+    # Changing every second is clamped to the lower bound
+    clock.now_ns += SECOND_NS
+    cache.set('A_1m', make_series([1, 2]), '1m')
+    assert cache.ttl_for('A_1m', '1m') == 30 * SECOND_NS
+
+    # In between, the TTL is half the time since the last change
+    clock.now_ns += 100 * SECOND_NS
+    assert cache.ttl_for('A_1m', '1m') == 50 * SECOND_NS
+
+    # Stable for long is clamped to the upper bound
+    clock.now_ns += 900 * SECOND_NS
+    assert cache.ttl_for('A_1m', '1m') == 240 * SECOND_NS
+
+
+def test_parse_chart_drops_bars_without_prices():
+    result = {
+        'timestamp': [60, 120, 180],
+        'indicators': {'quote': [{
+            'open': [1.0, None, 3.0],
+            'high': [1.0, None, None],
+            'close': [1.0, None, 3.0],
+            'volume': [10, None, None],
+        }]},
+    }
+
+    series = YFinanceProvider._parse_chart(result)
+
+    assert series.ts.tolist() == [60 * SECOND_NS, 180 * SECOND_NS]
+    assert series.open.tolist() == [1.0, 3.0]
+    assert np.isnan(series.high[1])
+    # Fields missing from the response entirely come back as NaN
+    assert np.isnan(series.low).all()
+    assert series.volume.tolist() == [10, 0]
+    assert series.volume.dtype == np.int64
+
+
+def test_parse_chart_without_bars_returns_none():
+    empty_quote = {'indicators': {'quote': [{'close': [None, None]}]}}
+
+    assert YFinanceProvider._parse_chart({'indicators': {'quote': [{}]}}) is None
+    assert YFinanceProvider._parse_chart({'timestamp': [60, 120], **empty_quote}) is None
+
+
+def test_parse_latest_picks_the_newest_bar_with_a_close():
+    result = {
+        'timestamp': [1_700_000_000, 1_700_000_060, 1_700_000_120],
+        'indicators': {'quote': [{
+            'open': [1.0, 2.0, None],
+            'high': [1.0, None, None],
+            'low': [1.0, 2.0, None],
+            'close': [1.0, 2.0, None],
+            'volume': [10, None, None],
+        }]},
+    }
+
+    quote = YFinanceProvider._parse_latest(result)
+
+    assert quote['Close'] == 2.0
+    assert quote['Open'] == 2.0
+    assert np.isnan(quote['High'])
+    assert quote['Volume'] == 0 and isinstance(quote['Volume'], int)
+    assert quote['Time'] == pd.Timestamp(1_700_000_060, unit='s').to_pydatetime()
+    assert quote['Time'].tzinfo is None
+
+
+def test_parse_latest_without_closes_returns_none():
+    result = {'timestamp': [60], 'indicators': {'quote': [{'close': [None]}]}}
+
+    assert YFinanceProvider._parse_latest(result) is None
+    assert YFinanceProvider._parse_latest({}) is None
+
+
+def test_fetch_chart_requests_each_symbol_and_skips_errors(provider):
+    def respond(url, params):
+        if url.endswith('/B'):
+            return {'chart': {'result': None, 'error': {'code': 'Not Found'}}}
+        return chart_payload([60, 120], [1.0, 2.0])
+
+    provider.respond = respond
+    data = asyncio.run(provider._fetch_chart(['A', 'B'], '1m', range_='5d'))
+
+    assert list(data) == ['A']
+    assert data['A'].close.tolist() == [1.0, 2.0]
+    assert [url for url, params in provider.calls] == [
+        YFinanceProvider.CHART_URL.format(symbol='A'),
+        YFinanceProvider.CHART_URL.format(symbol='B'),
+    ]
+    assert provider.calls[0][1]['range'] == '5d'
+    assert provider.calls[0][1]['interval'] == '1m'